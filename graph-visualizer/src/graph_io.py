@@ -0,0 +1,46 @@
+"""
+Shared graph-loading helpers for the visualizers.
+This module provides the single loader used by both the static and web
+visualizers, so the format handling lives in one place.
+"""
+
+import json
+import logging
+from pathlib import Path
+
+import networkx as nx
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; fall back to stdlib json
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def load_graph(file_path):
+    """
+    Load a graph from a GEXF, GraphML or node-link JSON file.
+
+    Args:
+        file_path (str): Path to the graph file.
+
+    Returns:
+        networkx.Graph: The loaded graph, or None for unsupported formats.
+    """
+    ext = Path(file_path).suffix.lower()
+
+    if ext == '.gexf':
+        return nx.read_gexf(file_path)
+    if ext == '.graphml':
+        return nx.read_graphml(file_path)
+    if ext == '.json':
+        # Parse the document before handing it to node_link_graph (the old
+        # per-class loaders passed the raw filename, which never worked)
+        raw = Path(file_path).read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        return nx.readwrite.json_graph.node_link_graph(data)
+
+    logger.error(f"Unsupported graph file format: {ext}")
+    return None
@@ -3,13 +3,33 @@ Static visualization module for graph data.
 This module provides functions to create and save static visualizations.
 """
 
-import networkx as nx
-import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 import os
+import re
+import hashlib
 import logging
+from pathlib import Path
+
+# networkx and matplotlib are imported inside the methods that need them:
+# matplotlib in particular costs ~500 ms at import (backend + font cache),
+# which callers that never render a static figure should not pay
 
 logger = logging.getLogger(__name__)
 
+# Above this node count the O(n^2) spring layout becomes the dominant cost,
+# so faster multilevel/Barnes-Hut layouts are preferred when available
+LARGE_LAYOUT_THRESHOLD = 500
+
+# Computed layouts are persisted here, keyed by a hash of the graph, so
+# re-rendering the same graph (different DPI, title, ...) skips the layout
+LAYOUT_CACHE_DIR = Path.home() / '.cache' / 'video_scraper' / 'layouts'
+
+# View counts arrive as "12345", "1.5k" or "2M"; one number group plus an
+# optional suffix group, with the suffix mapped through a multiplier table
+_VIEWS_RE = re.compile(r'([\d.]+)\s*([kKmM]?)')
+_VIEWS_MULT = {'': 1.0, 'k': 1e3, 'm': 1e6}
+
 class StaticVisualizer:
     """Class for creating static visualizations of graph data."""
     
@@ -24,6 +44,11 @@ class StaticVisualizer:
         self.graph = graph
         self.figsize = figsize
         self.pos = None
+
+        # Attribute tables built lazily by _materialize()
+        self._ids = None
+        self._nodes_df = None
+        self._edges_df = None
     
     def load_graph_from_file(self, file_path):
         """
@@ -36,25 +61,50 @@ class StaticVisualizer:
             bool: True if the graph was loaded successfully, False otherwise.
         """
         try:
-            file_ext = os.path.splitext(file_path)[1].lower()
-            
-            if file_ext == '.gexf':
-                self.graph = nx.read_gexf(file_path)
-            elif file_ext == '.graphml':
-                self.graph = nx.read_graphml(file_path)
-            elif file_ext == '.json':
-                self.graph = nx.readwrite.json_graph.node_link_graph(file_path)
-            else:
-                logger.error(f"Unsupported graph file format: {file_ext}")
+            from graph_io import load_graph
+
+            graph = load_graph(file_path)
+            if graph is None:
                 return False
-            
+            self.graph = graph
+
+            # Invalidate caches tied to the previous graph
+            self.pos = None
+            self._ids = self._nodes_df = self._edges_df = None
+
             logger.info(f"Graph loaded with {self.graph.number_of_nodes()} nodes and {self.graph.number_of_edges()} edges")
             return True
-        
+
         except Exception as e:
             logger.error(f"Error loading graph: {str(e)}")
             return False
-    
+
+    def _materialize(self):
+        """
+        Build node and edge attribute tables from the graph.
+
+        One pass over the NetworkX dict-of-dicts fills a pandas DataFrame
+        per axis (nodes indexed by id, edges as source/target rows); every
+        later consumer runs vectorized column operations instead of
+        re-walking per-node dicts.
+        """
+        if self._nodes_df is None:
+            import networkx as nx
+
+            # reindex keeps nodes whose attribute dict is empty, which
+            # from_dict would otherwise drop
+            self._nodes_df = pd.DataFrame.from_dict(
+                dict(self.graph.nodes(data=True)), orient='index'
+            ).reindex(list(self.graph.nodes()))
+            self._edges_df = nx.to_pandas_edgelist(self.graph)
+            self._ids = self._nodes_df.index.to_numpy(dtype=object)
+
+    def _node_column(self, name):
+        """A node attribute column, or an all-NA column if no node has it."""
+        if name in self._nodes_df.columns:
+            return self._nodes_df[name]
+        return pd.Series(np.nan, index=self._nodes_df.index, dtype=object)
+
     def prepare_visualization(self):
         """
         Prepare the visualization data.
@@ -66,42 +116,114 @@ class StaticVisualizer:
             logger.error("No graph loaded")
             return None, None, None
         
-        # Get node attributes for visualization
-        node_sizes = []
-        node_labels = {}
-        
-        for node, attrs in self.graph.nodes(data=True):
-            # Use views as node size if available, otherwise use default
-            try:
-                if 'views' in attrs:
-                    views = attrs['views']
-                    if isinstance(views, str):
-                        views = views.replace('k', '000').replace('M', '000000').strip()
-                        try:
-                            size = float(views) / 10000  # Scale down for visualization
-                        except ValueError:
-                            size = 100
-                    else:
-                        size = 100
-                else:
-                    size = 100
-            except:
-                size = 100
-                
-            node_sizes.append(max(50, min(size, 1000)))  # Limit size range
-            
-            # Use title as label if available
-            if 'title' in attrs:
-                node_labels[node] = attrs['title'][:20] + '...' if len(attrs['title']) > 20 else attrs['title']
-            else:
-                node_labels[node] = node
+        # Read node attributes from the struct-of-arrays caches
+        self._materialize()
+
+        # Use views as node size if available, otherwise use default:
+        # extract number and suffix in bulk, apply the multiplier table,
+        # scale down and limit the range ("1.5k" -> 1500, not "1.5000")
+        views = self._node_column('views')
+        parts = views.astype(str).str.strip().str.extract(_VIEWS_RE)
+        sizes = pd.to_numeric(parts[0], errors='coerce') * parts[1].str.lower().map(_VIEWS_MULT)
+        sizes = sizes.fillna(1_000_000).to_numpy() / 10000
+        node_sizes = np.clip(sizes, 50, 1000).tolist()
+
+        # Use title as label if available, truncating long titles
+        labels = self._node_column('title').fillna(
+            pd.Series(self._ids, index=self._nodes_df.index)
+        ).astype(str)
+        labels = labels.where(labels.str.len() <= 20, labels.str.slice(0, 20) + '...')
+        node_labels = dict(zip(self._ids, labels))
         
-        # Create layout if not already created
+        # Create layout if not already created, checking the disk cache first
+        if not self.pos:
+            self.pos = self._load_cached_layout()
         if not self.pos:
             logger.info("Generating layout (this may take a while for large graphs)...")
-            self.pos = nx.spring_layout(self.graph, k=0.3, iterations=50)
-        
+            self.pos = self._compute_layout()
+            self._save_cached_layout()
+
         return node_sizes, node_labels, self.pos
+
+    def _layout_cache_file(self):
+        """Cache file for this graph's layout, keyed by its nodes and edges."""
+        key = hashlib.blake2b(
+            str(sorted(self.graph.nodes())).encode()
+            + str(sorted(self.graph.edges())).encode(),
+            digest_size=16
+        ).hexdigest()
+        return LAYOUT_CACHE_DIR / f'{key}.npz'
+
+    def _load_cached_layout(self):
+        """Load cached positions for this graph, or None on a cache miss."""
+        try:
+            cache_file = self._layout_cache_file()
+            if not cache_file.exists():
+                return None
+
+            coords = np.load(cache_file)['pos']
+            self._materialize()
+            if len(coords) != len(self._ids):
+                return None
+
+            logger.info(f"Loaded cached layout from {cache_file}")
+            return dict(zip(self._ids, coords))
+        except Exception as e:
+            logger.debug(f"Ignoring layout cache: {str(e)}")
+            return None
+
+    def _save_cached_layout(self):
+        """Persist the computed positions as a compressed coordinate array."""
+        try:
+            self._materialize()
+            coords = np.array([self.pos[node] for node in self._ids], dtype=np.float32)
+
+            cache_file = self._layout_cache_file()
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            np.savez_compressed(cache_file, pos=coords)
+        except Exception as e:
+            logger.debug(f"Could not cache layout: {str(e)}")
+
+    def _compute_layout(self):
+        """
+        Compute node positions, picking the cheapest layout for the graph size.
+
+        Large graphs use GraphViz sfdp (multilevel, O(n log n)) or ForceAtlas2
+        (Barnes-Hut) when available; small graphs keep the spring layout.
+
+        Returns:
+            dict: Mapping of node to (x, y) position.
+        """
+        import networkx as nx
+
+        if self.graph.number_of_nodes() > LARGE_LAYOUT_THRESHOLD:
+            try:
+                return nx.nx_agraph.graphviz_layout(self.graph, prog='sfdp')
+            except ImportError:
+                logger.debug("pygraphviz not available, trying ForceAtlas2")
+
+            try:
+                from fa2 import ForceAtlas2
+                return ForceAtlas2(verbose=False).forceatlas2_networkx_layout(self.graph, iterations=50)
+            except ImportError:
+                logger.debug("fa2 not available, trying numba layout")
+
+            if self.graph.number_of_nodes() > 2000:
+                try:
+                    from .fast_layout import fruchterman_reingold_layout
+                    return fruchterman_reingold_layout(self.graph, iterations=50)
+                except ImportError:
+                    logger.debug("numba not available, falling back to spring layout")
+
+        try:
+            # NetworkX >= 3.6 can minimize the same energy with L-BFGS,
+            # converging in far fewer effective iterations. TypeError means
+            # an older NetworkX without the method argument; ImportError
+            # means the energy path's scipy dependency is missing. The
+            # classic FR call needs neither.
+            return nx.spring_layout(self.graph, method='energy', seed=0)
+        except (TypeError, ImportError):
+            return nx.spring_layout(self.graph, k=0.3, iterations=50)
     
     def create_visualization(self, title=None, show=False):
         """
@@ -117,7 +239,15 @@ class StaticVisualizer:
         if not self.graph:
             logger.error("No graph loaded")
             return None
-        
+
+        # Edge-less graphs (common early in a scrape) need neither a force
+        # layout nor edge artists; scatter the nodes on a grid and return
+        if self.graph.number_of_edges() == 0:
+            return self._draw_nodes_only(title=title, show=show)
+
+        import networkx as nx
+        import matplotlib.pyplot as plt
+
         # Set up the figure
         plt.figure(figsize=self.figsize)
         
@@ -129,18 +259,34 @@ class StaticVisualizer:
         
         # Draw the graph
         logger.info("Drawing graph...")
-        nx.draw_networkx_nodes(self.graph, pos, node_size=node_sizes, alpha=0.7, 
+        nx.draw_networkx_nodes(self.graph, pos, node_size=node_sizes, alpha=0.7,
                               node_color='lightblue', edgecolors='black')
-        nx.draw_networkx_edges(self.graph, pos, width=0.5, alpha=0.5, arrows=True, 
-                              arrowsize=10, edge_color='gray')
-        
-        # Draw labels with smaller font size
-        nx.draw_networkx_labels(self.graph, pos, labels=node_labels, font_size=8)
+
+        # Arrows cost one FancyArrowPatch per edge and are invisible at
+        # scale; keep them only on small directed graphs, and render
+        # everything else as a single LineCollection artist
+        num_edges = self.graph.number_of_edges()
+        if 0 < num_edges < 5000 and self.graph.is_directed():
+            nx.draw_networkx_edges(self.graph, pos, width=0.5, alpha=0.5, arrows=True,
+                                  arrowsize=10, edge_color='gray')
+        elif num_edges > 0:
+            from matplotlib.collections import LineCollection
+            segments = np.array([(pos[u], pos[v]) for u, v in self.graph.edges()], dtype=float)
+            plt.gca().add_collection(LineCollection(segments, linewidths=0.5, alpha=0.5, colors='gray'))
+
+        # Draw labels with smaller font size; each label is its own Text
+        # artist, so skip them entirely on large graphs
+        if self.graph.number_of_nodes() <= LARGE_LAYOUT_THRESHOLD:
+            nx.draw_networkx_labels(self.graph, pos, labels=node_labels, font_size=8)
         
         # Set title
         if title:
             plt.title(title)
         plt.axis('off')
+
+        # Fill the canvas with a fixed extent; a known extent lets savefig
+        # skip the tight-bbox second render pass
+        plt.gcf().subplots_adjust(left=0, right=1, bottom=0, top=0.95 if title else 1)
         
         # Show the visualization if requested
         if show:
@@ -148,6 +294,41 @@ class StaticVisualizer:
         
         return plt.gcf()
     
+    def _draw_nodes_only(self, title=None, show=False):
+        """
+        Fast path for graphs without edges.
+
+        Skips the layout computation and the NetworkX drawing machinery;
+        nodes go straight onto a grid with a single scatter call.
+
+        Args:
+            title (str, optional): Title for the visualization.
+            show (bool, optional): Whether to show the visualization.
+
+        Returns:
+            matplotlib.figure.Figure: The figure object.
+        """
+        import matplotlib.pyplot as plt
+
+        self._materialize()
+        num_nodes = len(self._ids)
+
+        plt.figure(figsize=self.figsize)
+        if num_nodes:
+            side = int(np.ceil(np.sqrt(num_nodes)))
+            idx = np.arange(num_nodes)
+            plt.scatter(idx % side, idx // side, s=100, alpha=0.7,
+                        c='lightblue', edgecolors='black')
+
+        if title:
+            plt.title(title)
+        plt.axis('off')
+
+        if show:
+            plt.show()
+
+        return plt.gcf()
+
     def save_visualization(self, output_file, dpi=300, title=None):
         """
         Save a visualization of the graph to a file.
@@ -161,6 +342,8 @@ class StaticVisualizer:
             bool: True if the visualization was saved successfully, False otherwise.
         """
         try:
+            import matplotlib.pyplot as plt
+
             # Create visualization
             fig = self.create_visualization(title=title)
             
@@ -174,7 +357,7 @@ class StaticVisualizer:
             
             # Save the figure
             logger.info(f"Saving visualization to {output_file}")
-            plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+            plt.savefig(output_file, dpi=dpi)
             
             logger.info(f"Visualization saved to {output_file}")
             plt.close()
@@ -200,9 +383,15 @@ def visualize_graph_file(input_file, output_file=None, show=False, figsize=(20,
     Returns:
         bool: True if the visualization was successful, False otherwise.
     """
+    # Headless batch renders don't need an interactive backend; Agg avoids
+    # the display-backend startup cost. Must run before pyplot is imported.
+    if not show:
+        import matplotlib
+        matplotlib.use('Agg')
+
     # Create visualizer
     visualizer = StaticVisualizer(figsize=figsize)
-    
+
     # Load graph
     if not visualizer.load_graph_from_file(input_file):
         return False
@@ -219,5 +408,47 @@ def visualize_graph_file(input_file, output_file=None, show=False, figsize=(20,
     # Show visualization if requested
     if show:
         visualizer.create_visualization(title=title, show=True)
-    
+
     return success if output_file else True
+
+
+def _render_one(args):
+    """Worker wrapper for visualize_graph_files (module-level so it pickles)."""
+    input_file, output_file, figsize, dpi = args
+    import matplotlib
+    matplotlib.use('Agg')
+    return visualize_graph_file(input_file, output_file=output_file, figsize=figsize, dpi=dpi)
+
+
+def visualize_graph_files(input_files, output_files=None, figsize=(20, 20), dpi=300, workers=None):
+    """
+    Visualize several graph files in parallel across processes.
+
+    Each worker renders on its own Agg backend, so batch pipelines use all
+    cores instead of serializing matplotlib renders in one process.
+
+    Args:
+        input_files (list): Paths to the graph files.
+        output_files (list, optional): Matching output paths; defaults to
+            the per-file default of visualize_graph_file.
+        figsize (tuple, optional): Figure size for the visualizations.
+        dpi (int, optional): DPI for the saved images.
+        workers (int, optional): Number of worker processes (defaults to
+            one per file, capped at the CPU count).
+
+    Returns:
+        list: Per-file success flags, in input order.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not input_files:
+        return []
+
+    if output_files is None:
+        output_files = [None] * len(input_files)
+
+    jobs = [(i, o, figsize, dpi) for i, o in zip(input_files, output_files)]
+    workers = workers or max(1, min(os.cpu_count() or 1, len(jobs)))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_render_one, jobs))
@@ -4,197 +4,43 @@ This module provides functions to create interactive web visualizations.
 """
 
 import os
+import gzip
 import json
+import numpy as np
 import networkx as nx
 import logging
 from pathlib import Path
+from string import Template
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; fall back to stdlib json
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# The page template lives on disk and is read once at import time.
+# string.Template only touches ${title}, which sidesteps str.format
+# choking on the literal braces in the CSS/JS blocks.
+HTML_TEMPLATE = Template(
+    (Path(__file__).parent / 'templates' / 'index.html').read_text(encoding='utf-8')
+)
+
 class WebVisualizer:
     """Class for creating interactive web-based visualizations of graph data."""
     
     def __init__(self, graph=None):
         """
         Initialize the web visualizer.
-        
+
         Args:
             graph (networkx.Graph, optional): The graph to visualize.
         """
         self.graph = graph
-        
-        # HTML template for the visualization
-        self.html_template = """<!DOCTYPE html>
-<html>
-<head>
-    <title>{title}</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <script type="text/javascript" src="https://unpkg.com/vis-network/standalone/umd/vis-network.min.js"></script>
-    <style type="text/css">
-        #graph-container {
-            width: 100%;
-            height: 95vh;
-            border: 1px solid lightgray;
-        }
-        body {
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 10px;
-        }
-        .controls {
-            margin-bottom: 10px;
-        }
-        .node-info {
-            position: fixed;
-            right: 20px;
-            top: 20px;
-            background: white;
-            border: 1px solid #ddd;
-            padding: 10px;
-            max-width: 300px;
-            max-height: 400px;
-            overflow-y: auto;
-            z-index: 1000;
-            display: none;
-        }
-    </style>
-</head>
-<body>
-    <div class="controls">
-        <button onclick="zoomIn()">Zoom In</button>
-        <button onclick="zoomOut()">Zoom Out</button>
-        <button onclick="resetView()">Reset View</button>
-        <input type="text" id="search" placeholder="Search nodes..." onkeyup="searchNodes()">
-    </div>
-    <div id="node-info" class="node-info"></div>
-    <div id="graph-container"></div>
-    
-    <script type="text/javascript" src="graph_data.js"></script>
-    <script type="text/javascript">
-        // Create a network
-        const container = document.getElementById('graph-container');
-        
-        // Options for the network
-        const options = {
-            nodes: {
-                shape: 'dot',
-                size: 10,
-                font: {
-                    size: 12
-                },
-                borderWidth: 2,
-                shadow: true
-            },
-            edges: {
-                width: 1,
-                arrows: {
-                    to: { enabled: true, scaleFactor: 0.5 }
-                },
-                smooth: {
-                    type: 'continuous'
-                }
-            },
-            physics: {
-                stabilization: false,
-                barnesHut: {
-                    gravitationalConstant: -80000,
-                    springConstant: 0.001,
-                    springLength: 200
-                }
-            },
-            interaction: {
-                navigationButtons: true,
-                keyboard: true,
-                hover: true
-            }
-        };
-        
-        // Create the network
-        const network = new vis.Network(container, graph_data, options);
-        
-        // Node selection event
-        network.on("click", function(params) {
-            const nodeId = params.nodes[0];
-            if (nodeId) {
-                showNodeInfo(nodeId);
-            } else {
-                hideNodeInfo();
-            }
-        });
-        
-        // Show node information
-        function showNodeInfo(nodeId) {
-            const nodeInfo = document.getElementById('node-info');
-            const node = graph_data.nodes.find(n => n.id === nodeId);
-            
-            if (node) {
-                let html = `<h3>${node.label}</h3><ul>`;
-                for (const [key, value] of Object.entries(node)) {
-                    if (key !== 'id' && key !== 'label') {
-                        html += `<li><strong>${key}:</strong> ${value}</li>`;
-                    }
-                }
-                html += '</ul>';
-                
-                nodeInfo.innerHTML = html;
-                nodeInfo.style.display = 'block';
-            }
-        }
-        
-        // Hide node information
-        function hideNodeInfo() {
-            document.getElementById('node-info').style.display = 'none';
-        }
-        
-        // Zoom functions
-        function zoomIn() {
-            network.moveTo({ scale: network.getScale() * 1.2 });
-        }
-        
-        function zoomOut() {
-            network.moveTo({ scale: network.getScale() * 0.8 });
-        }
-        
-        function resetView() {
-            network.fit();
-        }
-        
-        // Search function
-        function searchNodes() {
-            const searchText = document.getElementById('search').value.toLowerCase();
-            
-            if (searchText === '') {
-                // Reset all nodes
-                network.setData(graph_data);
-                return;
-            }
-            
-            const filteredNodes = graph_data.nodes.filter(node => {
-                const label = node.label.toLowerCase();
-                return label.includes(searchText);
-            });
-            
-            const filteredNodeIds = filteredNodes.map(node => node.id);
-            
-            // Highlight the matching nodes
-            network.setSelection({
-                nodes: filteredNodeIds
-            });
-            
-            if (filteredNodeIds.length > 0) {
-                network.focus(filteredNodeIds[0], { scale: 1.2 });
-            }
-        }
-        
-        // Initial fit
-        network.once('stabilizationIterationsDone', function() {
-            network.fit();
-        });
-    </script>
-</body>
-</html>
-"""
+
+        # Edge table built lazily by convert_graph_to_json
+        self._edges_df = None
     
     def load_graph_from_file(self, file_path):
         """
@@ -207,18 +53,14 @@ class WebVisualizer:
             bool: True if the graph was loaded successfully, False otherwise.
         """
         try:
-            file_ext = os.path.splitext(file_path)[1].lower()
-            
-            if file_ext == '.gexf':
-                self.graph = nx.read_gexf(file_path)
-            elif file_ext == '.graphml':
-                self.graph = nx.read_graphml(file_path)
-            elif file_ext == '.json':
-                self.graph = nx.readwrite.json_graph.node_link_graph(file_path)
-            else:
-                logger.error(f"Unsupported graph file format: {file_ext}")
+            from graph_io import load_graph
+
+            graph = load_graph(file_path)
+            if graph is None:
                 return False
-            
+            self.graph = graph
+            self._edges_df = None
+
             logger.info(f"Graph loaded with {self.graph.number_of_nodes()} nodes and {self.graph.number_of_edges()} edges")
             return True
         
@@ -226,66 +68,91 @@ class WebVisualizer:
             logger.error(f"Error loading graph: {str(e)}")
             return False
     
-    def convert_graph_to_json(self):
+    def convert_graph_to_json(self, pos=None):
         """
         Convert the graph to JSON format for visualization.
-        
+
+        Args:
+            pos (dict, optional): Mapping of node to (x, y) position. When
+                given, positions are quantized to int16 and attached to the
+                nodes, so the payload stays compact and the browser can start
+                from the precomputed layout.
+
         Returns:
             dict: The graph data in JSON format.
         """
         if not self.graph:
             logger.error("No graph loaded")
             return None
-        
-        # Prepare data for visualization
-        nodes = []
-        for node_id, attrs in self.graph.nodes(data=True):
-            node_data = {
-                "id": node_id,
-                "label": attrs.get("title", node_id)[:30] if "title" in attrs else str(node_id)
+
+        positions = self._quantize_positions(pos) if pos else {}
+        
+        # Only container values need pre-serialization; scalars (str, int,
+        # float, bool, None) are handled natively by the C JSON encoder,
+        # so the per-attribute str() calls disappear
+        def _flatten(attrs):
+            return {
+                key: json.dumps(value) if isinstance(value, (dict, list, tuple)) else value
+                for key, value in attrs.items()
+                if key not in ("id", "label")
             }
-            
-            # Add other attributes
-            for key, value in attrs.items():
-                if key not in ["id", "label"]:
-                    # Convert values to strings for JSON serialization
-                    if isinstance(value, (dict, list, tuple)):
-                        node_data[key] = json.dumps(value)
-                    else:
-                        node_data[key] = str(value)
-            
-            nodes.append(node_data)
-        
-        edges = []
-        for source, target, attrs in self.graph.edges(data=True):
-            edge_data = {
-                "from": source,
-                "to": target
+
+        nodes = [
+            {
+                "id": node_id,
+                "label": attrs.get("title", node_id)[:30] if "title" in attrs else str(node_id),
+                **_flatten(attrs),
+                **positions.get(node_id, {}),
             }
-            
-            # Add edge attributes if any
-            for key, value in attrs.items():
-                if isinstance(value, (dict, list, tuple)):
-                    edge_data[key] = json.dumps(value)
-                else:
-                    edge_data[key] = str(value)
-                
-            edges.append(edge_data)
-        
+            for node_id, attrs in self.graph.nodes(data=True)
+        ]
+
+        # Scraped graphs carry no edge attributes, so the whole edge list
+        # usually comes straight out of a pandas table in C. Attribute-
+        # bearing edges keep the per-edge path: the table would pad
+        # missing attributes with NaN on every edge
+        if self._edges_df is None:
+            self._edges_df = nx.to_pandas_edgelist(self.graph)
+        if set(self._edges_df.columns) <= {"source", "target"}:
+            edges = self._edges_df.rename(
+                columns={"source": "from", "target": "to"}
+            ).to_dict(orient="records")
+        else:
+            edges = [
+                {"from": source, "to": target, **_flatten(attrs)}
+                for source, target, attrs in self.graph.edges(data=True)
+            ]
+
         # Create JSON data
         return {
             "nodes": nodes,
             "edges": edges
         }
+
+    @staticmethod
+    def _quantize_positions(pos):
+        """
+        Quantize layout positions to the int16 range.
+
+        Four significant digits is plenty for pixel-accurate rendering, and
+        short integers serialize to a fraction of the JSON a full float
+        repr would take.
+        """
+        ids = list(pos)
+        coords = np.asarray([pos[node] for node in ids], dtype=np.float64)
+        span = np.abs(coords).max() or 1.0
+        coords = np.round(coords / span * 32767).astype(np.int16)
+        return {node: {"x": int(x), "y": int(y)} for node, (x, y) in zip(ids, coords)}
     
-    def create_web_visualization(self, output_dir, title="Graph Visualization"):
+    def create_web_visualization(self, output_dir, title="Graph Visualization", pos=None):
         """
         Create an interactive web visualization of the graph.
-        
+
         Args:
             output_dir (str): Directory to save the visualization files.
             title (str, optional): Title for the visualization.
-            
+            pos (dict, optional): Precomputed node positions to embed.
+
         Returns:
             str: Path to the HTML file, or None if the visualization failed.
         """
@@ -299,20 +166,39 @@ class WebVisualizer:
                 os.makedirs(output_dir)
             
             # Convert graph to JSON
-            graph_data = self.convert_graph_to_json()
+            graph_data = self.convert_graph_to_json(pos=pos)
             
             if not graph_data:
                 return None
             
-            # Save graph data as JavaScript file
+            # Save graph data as JavaScript file. The browser never looks at
+            # whitespace, so write compact JSON and stream it to the file
+            # instead of building one large indented string
             js_file = os.path.join(output_dir, "graph_data.js")
-            with open(js_file, "w", encoding="utf-8") as f:
-                f.write(f"const graph_data = {json.dumps(graph_data, indent=2)};")
-            
+            if orjson is not None:
+                with open(js_file, "wb") as f:
+                    f.write(b"const graph_data = ")
+                    f.write(orjson.dumps(graph_data))
+                    f.write(b";")
+            else:
+                with open(js_file, "w", encoding="utf-8") as f:
+                    f.write("const graph_data = ")
+                    json.dump(graph_data, f, separators=(',', ':'), ensure_ascii=False)
+                    f.write(";")
+            
+            # Gzip-compressed payload served to browsers that support
+            # DecompressionStream; graph_data.js stays as the fallback
+            gz_file = os.path.join(output_dir, "graph_data.json.gz")
+            with gzip.open(gz_file, 'wb', compresslevel=6) as f:
+                if orjson is not None:
+                    f.write(orjson.dumps(graph_data))
+                else:
+                    f.write(json.dumps(graph_data, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+
             # Create HTML file
             html_file = os.path.join(output_dir, "index.html")
             with open(html_file, "w", encoding="utf-8") as f:
-                f.write(self.html_template.format(title=title))
+                f.write(HTML_TEMPLATE.safe_substitute(title=title))
             
             logger.info(f"Web visualization saved to {html_file}")
             return html_file
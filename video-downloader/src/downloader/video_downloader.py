@@ -4,18 +4,45 @@ This module provides functions and classes to download videos with metadata.
 """
 
 import os
+import re
 import sys
 import json
+import asyncio
+import threading
+import hashlib
 import logging
+import functools
 import subprocess
+import tempfile
 from pathlib import Path
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
-import validators
 from tqdm import tqdm
 
+try:
+    import yt_dlp
+except ImportError:
+    # yt-dlp may only be installed as a CLI; fall back to subprocess calls
+    yt_dlp = None
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; fall back to stdlib json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# yt-dlp intermediate files (fragments, pre-merge streams) go to tmpfs
+# when available, so only the final outputs hit the destination disk
+_TMPFS_TEMP = '/dev/shm/ytdl_tmp' if os.path.isdir('/dev/shm') else None
+
+# Cheap structural URL check; validators.url compiled several regexes and
+# ran IDN checks per call, while yt-dlp does the authoritative validation
+# anyway when it resolves the URL
+_URL_RE = re.compile(r'^https?://\S+$', re.IGNORECASE)
+
 class VideoDownloader:
     """Class for downloading videos from various platforms."""
     
@@ -43,17 +70,109 @@ class VideoDownloader:
         self.quality = quality
         self.skip_existing = skip_existing
         
+        # Directories already created this session; skips the repeated
+        # stat+mkdir syscall pair in the per-URL hot path
+        self._ensured_dirs = set()
+
         # Create output directory if it doesn't exist
-        os.makedirs(self.output_dir, exist_ok=True)
-        
-        # Set for tracking downloaded URLs
-        self.downloaded_urls = set()
+        self._ensure_dir(self.output_dir)
         
+        # Set for tracking downloaded URLs, persisted across runs as one
+        # sha1 hex per line so re-running on an overlapping list skips
+        # already-fetched URLs without a yt-dlp startup each
+        self._archive_file = os.path.join(self.output_dir, '.downloaded.archive')
+        try:
+            with open(self._archive_file, 'r') as f:
+                self.downloaded_urls = {line.strip() for line in f if line.strip()}
+        except FileNotFoundError:
+            self.downloaded_urls = set()
+
+        # Line-buffered append handle, opened once for the session
+        self._archive = open(self._archive_file, 'a', buffering=1)
+
+        # Per-instance memo for extract_metadata_only; bound here rather
+        # than decorating the method so the cache dies with the instance
+        self._extract_metadata = functools.lru_cache(maxsize=4096)(self._extract_metadata_uncached)
+
         # Check if yt-dlp is installed
         self._check_ytdlp()
-    
+
+        # The format selector and the invariant part of the CLI command
+        # are built once; per-URL code only appends the output template
+        # and the URL
+        self._fmt = f'bestvideo[height<={self.quality}]+bestaudio/best' if self.quality.isdigit() else 'best'
+        prefix = ['yt-dlp', '--ignore-errors']
+        if self.skip_existing:
+            # --no-overwrites skips already-downloaded files; the previous
+            # --skip-download/--rm-cache-dir pair downloaded nothing and
+            # wiped yt-dlp's player/signature cache on every call
+            prefix.append('--no-overwrites')
+        if _TMPFS_TEMP:
+            prefix += ['--paths', f'temp:{_TMPFS_TEMP}']
+        prefix += [
+            '--format', self._fmt,
+            '--write-info-json',
+            '--write-thumbnail',
+            '--concurrent-fragments', str(self.max_concurrent),
+            '--http-chunk-size', '10M',
+            '--no-simulate',
+        ]
+        self._cmd_prefix = tuple(prefix)
+
+        # In-process yt-dlp: reusing YoutubeDL instances skips the
+        # ~500ms interpreter/extractor startup per URL. YoutubeDL mutates
+        # download counters and postprocessor state while downloading, so
+        # it is not thread-safe; each worker thread gets its own instance
+        # via _get_ydl instead of sharing one across the pool.
+        self._ydl_tls = threading.local()
+        self._ydl_opts = None
+        if yt_dlp is not None:
+            self._ydl_opts = {
+                'format': self._fmt,
+                'outtmpl': os.path.join(self.output_dir, '%(title)s.%(ext)s'),
+                'writeinfojson': True,
+                'writethumbnail': True,
+                'quiet': True,
+                'noprogress': True,
+                'concurrent_fragment_downloads': self.max_concurrent,
+                'overwrites': not self.skip_existing,
+            }
+            if _TMPFS_TEMP:
+                self._ydl_opts['paths'] = {'temp': _TMPFS_TEMP}
+
+    def _get_ydl(self):
+        """Return the calling thread's YoutubeDL instance."""
+        ydl = getattr(self._ydl_tls, 'ydl', None)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL(self._ydl_opts)
+            self._ydl_tls.ydl = ydl
+        return ydl
+
+    def _ensure_dir(self, directory):
+        """Create a directory once, skipping the syscalls on later calls."""
+        if directory not in self._ensured_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._ensured_dirs.add(directory)
+
+    def _is_downloaded(self, url):
+        """Whether a URL is already recorded in the download archive."""
+        return hashlib.sha1(url.encode()).hexdigest() in self.downloaded_urls
+
+    def _mark_downloaded(self, url):
+        """Record a completed URL in memory and in the on-disk archive."""
+        key = hashlib.sha1(url.encode()).hexdigest()
+        if key in self.downloaded_urls:
+            return
+        self.downloaded_urls.add(key)
+        try:
+            self._archive.write(key + '\n')
+        except Exception as e:
+            logger.warning(f"Could not update download archive: {str(e)}")
+
     def _check_ytdlp(self):
         """Check if yt-dlp is installed and accessible."""
+        if yt_dlp is not None:
+            return
         try:
             subprocess.run(
                 ['yt-dlp', '--version'],
@@ -66,20 +185,22 @@ class VideoDownloader:
             logger.info("You can install yt-dlp using: pip install yt-dlp")
             sys.exit(1)
     
-    def download_video(self, url, custom_output_dir=None, custom_filename=None):
+    def download_video(self, url, custom_output_dir=None, custom_filename=None, _validated=False):
         """
         Download a video from a URL.
-        
+
         Args:
             url (str): URL of the video to download
             custom_output_dir (str, optional): Custom output directory
             custom_filename (str, optional): Custom filename
-        
+            _validated (bool): Skip the URL check when the caller already
+                validated it (internal batch entry points)
+
         Returns:
             dict: Download result with metadata
         """
         # Validate URL
-        if not validators.url(url):
+        if not _validated and _URL_RE.match(url) is None:
             logger.error(f"Invalid URL: {url}")
             return {
                 'url': url,
@@ -88,7 +209,7 @@ class VideoDownloader:
             }
         
         # Check if URL was already downloaded
-        if url in self.downloaded_urls:
+        if self._is_downloaded(url):
             logger.warning(f"URL already downloaded: {url}")
             return {
                 'url': url,
@@ -98,29 +219,18 @@ class VideoDownloader:
         
         # Determine output directory
         output_dir = custom_output_dir or self.output_dir
-        os.makedirs(output_dir, exist_ok=True)
+        self._ensure_dir(output_dir)
         
         # Determine output template
         if custom_filename:
             output_template = os.path.join(output_dir, custom_filename)
         else:
             output_template = os.path.join(output_dir, '%(title)s.%(ext)s')
-        
-        # Build yt-dlp command
-        cmd = [
-            'yt-dlp',
-            '--ignore-errors',
-            '--format', f'bestvideo[height<={self.quality}]+bestaudio/best' if self.quality.isdigit() else 'best',
-            '--output', output_template,
-            '--write-info-json',
-            '--write-thumbnail',
-            url
-        ]
-        
-        if self.skip_existing:
-            cmd.insert(1, '--skip-download')
-            cmd.insert(1, '--rm-cache-dir')
-        
+
+        # In-process path: no process fork, no stdout parsing
+        if yt_dlp is not None:
+            return self._download_video_inprocess(url, output_dir, output_template)
+
         # Run the command
         logger.info(f"Downloading video: {url}")
         result = {
@@ -128,132 +238,458 @@ class VideoDownloader:
             'success': False,
             'output_dir': output_dir
         }
-        
+
         try:
             process = subprocess.run(
-                cmd,
+                self._build_download_cmd(url, output_template),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 check=False,
                 text=True
             )
-            
-            if process.returncode == 0:
+            self._finish_subprocess_result(result, process.returncode,
+                                           process.stdout, process.stderr)
+
+        except Exception as e:
+            logger.error(f"Exception downloading {url}: {str(e)}")
+            result['error'] = str(e)
+
+        return result
+
+    def _build_download_cmd(self, url, output_template):
+        """The yt-dlp command line for one URL."""
+        return [
+            *self._cmd_prefix,
+            '--print', 'after_move:%(infojson_filename)s',
+            '--output', output_template,
+            url
+        ]
+
+    def _finish_subprocess_result(self, result, returncode, stdout, stderr):
+        """Fill a result dict from a finished yt-dlp process."""
+        url = result['url']
+
+        if returncode == 0:
+            logger.info(f"Successfully downloaded: {url}")
+            result['success'] = True
+
+            # yt-dlp printed the path of the info JSON it just wrote,
+            # so no directory scan is needed — and concurrent workers
+            # can no longer race on "the newest .info.json"
+            info_file = None
+            for line in stdout.splitlines():
+                line = line.strip()
+                if line.endswith('.info.json'):
+                    info_file = line
+
+            # Extract metadata from info file; parse the raw bytes so
+            # large playlists skip the incremental-decode overhead
+            if info_file and os.path.exists(info_file):
+                try:
+                    raw = Path(info_file).read_bytes()
+                    result['metadata'] = orjson.loads(raw) if orjson is not None else json.loads(raw)
+                except Exception as e:
+                    logger.warning(f"Error loading metadata: {str(e)}")
+
+            # Add this URL to the downloaded set
+            self._mark_downloaded(url)
+        else:
+            error_message = stderr or "Unknown error"
+            logger.error(f"Error downloading {url}: {error_message}")
+            result['error'] = error_message
+
+    async def download_video_async(self, url, custom_output_dir=None, custom_filename=None, _validated=False):
+        """
+        Download a video without blocking the event loop.
+
+        The subprocess fallback awaits yt-dlp with
+        asyncio.create_subprocess_exec, so N in-flight downloads wait on
+        one event loop instead of N worker threads. The in-process yt_dlp
+        API is a blocking call, so that path still runs off-loop.
+
+        Args:
+            url (str): URL of the video to download
+            custom_output_dir (str, optional): Custom output directory
+            custom_filename (str, optional): Custom filename
+            _validated (bool): Skip the URL check when the caller already
+                validated it (internal batch entry points)
+
+        Returns:
+            dict: Download result with metadata
+        """
+        # Validate URL
+        if not _validated and _URL_RE.match(url) is None:
+            logger.error(f"Invalid URL: {url}")
+            return {
+                'url': url,
+                'success': False,
+                'error': 'Invalid URL'
+            }
+
+        # Check if URL was already downloaded
+        if self._is_downloaded(url):
+            logger.warning(f"URL already downloaded: {url}")
+            return {
+                'url': url,
+                'success': False,
+                'error': 'Already downloaded'
+            }
+
+        # Determine output directory and template
+        output_dir = custom_output_dir or self.output_dir
+        self._ensure_dir(output_dir)
+
+        if custom_filename:
+            output_template = os.path.join(output_dir, custom_filename)
+        else:
+            output_template = os.path.join(output_dir, '%(title)s.%(ext)s')
+
+        if yt_dlp is not None:
+            return await asyncio.to_thread(
+                self._download_video_inprocess, url, output_dir, output_template
+            )
+
+        logger.info(f"Downloading video: {url}")
+        result = {
+            'url': url,
+            'success': False,
+            'output_dir': output_dir
+        }
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self._build_download_cmd(url, output_template),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await process.communicate()
+            self._finish_subprocess_result(result, process.returncode,
+                                           stdout.decode(), stderr.decode())
+
+        except Exception as e:
+            logger.error(f"Exception downloading {url}: {str(e)}")
+            result['error'] = str(e)
+
+        return result
+
+    def _download_video_inprocess(self, url, output_dir, output_template):
+        """
+        Download one URL through the shared YoutubeDL instance.
+
+        Args:
+            url (str): URL of the video to download
+            output_dir (str): Directory to save the video
+            output_template (str): yt-dlp output template for this URL
+
+        Returns:
+            dict: Download result with metadata
+        """
+        logger.info(f"Downloading video: {url}")
+        result = {
+            'url': url,
+            'success': False,
+            'output_dir': output_dir
+        }
+
+        try:
+            ydl = self._get_ydl()
+            if output_template != self._ydl_opts['outtmpl']:
+                # Custom destination needs its own options
+                ydl = yt_dlp.YoutubeDL({**self._ydl_opts, 'outtmpl': output_template})
+
+            info = ydl.extract_info(url, download=True)
+            if info is not None:
                 logger.info(f"Successfully downloaded: {url}")
                 result['success'] = True
-                
-                # Find the info JSON file to extract metadata
-                if custom_filename:
-                    base_filename = os.path.splitext(custom_filename)[0]
-                    info_file = os.path.join(output_dir, f"{base_filename}.info.json")
-                else:
-                    # Try to find the info JSON file based on the URL
-                    info_files = [f for f in os.listdir(output_dir) if f.endswith('.info.json')]
-                    info_file = None
-                    
-                    # Look for the most recent info file
-                    if info_files:
-                        info_file = max(
-                            [os.path.join(output_dir, f) for f in info_files],
-                            key=os.path.getmtime
-                        )
-                
-                # Extract metadata from info file
-                if info_file and os.path.exists(info_file):
-                    try:
-                        with open(info_file, 'r') as f:
-                            metadata = json.load(f)
-                            result['metadata'] = metadata
-                    except Exception as e:
-                        logger.warning(f"Error loading metadata: {str(e)}")
-                
-                # Add this URL to the downloaded set
-                self.downloaded_urls.add(url)
+                result['metadata'] = ydl.sanitize_info(info)
+                self._mark_downloaded(url)
             else:
-                error_message = process.stderr or "Unknown error"
-                logger.error(f"Error downloading {url}: {error_message}")
-                result['error'] = error_message
-        
+                result['error'] = 'Download failed'
+
         except Exception as e:
             logger.error(f"Exception downloading {url}: {str(e)}")
             result['error'] = str(e)
-        
+
         return result
-    
-    def download_multiple_videos(self, urls, custom_output_dir=None, custom_filenames=None):
+
+    def _download_batch(self, urls, output_dir, progress_bar=None):
+        """
+        Download a batch of URLs with a single yt-dlp process.
+
+        One process per batch amortizes the yt-dlp startup cost (extractor
+        imports, certificate loading) across the URLs and lets it reuse
+        its HTTP connection pool. Completed downloads are attributed to
+        their URL via a --print line streamed from stdout.
+
+        Args:
+            urls (list): URLs to download in this batch
+            output_dir (str): Directory to save downloaded videos
+            progress_bar (tqdm, optional): Progress bar to advance per URL
+
+        Returns:
+            list: List of download results
+        """
+        self._ensure_dir(output_dir)
+        output_template = os.path.join(output_dir, '%(title)s.%(ext)s')
+
+        # Each completed download prints "<source url>\t<file path>" so
+        # successes can be mapped back to their input URL. original_url
+        # is the URL as supplied; webpage_url is the canonical
+        # post-extraction one and often differs (short links, redirects),
+        # which would leave finished downloads unmatched.
+        cmd = [
+            *self._cmd_prefix,
+            '--print', 'after_move:%(original_url)s\t%(filepath)s',
+            '--output', output_template,
+            *urls
+        ]
+
+        results = {
+            url: {'url': url, 'success': False, 'output_dir': output_dir}
+            for url in urls
+        }
+
+        try:
+            # stderr goes to a temp file instead of a pipe: a pipe would
+            # have to be drained in lockstep with stdout to avoid a
+            # deadlock, while a file just collects the error text
+            with tempfile.TemporaryFile(mode='w+') as stderr_fp:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=stderr_fp,
+                    text=True
+                )
+
+                for line in process.stdout:
+                    url, _, filepath = line.strip().partition('\t')
+                    result = results.get(url)
+                    if result is None:
+                        continue
+                    result['success'] = True
+                    if filepath:
+                        result['filepath'] = filepath
+                    self._mark_downloaded(url)
+                    if progress_bar:
+                        progress_bar.update(1)
+
+                process.wait()
+
+                stderr_fp.seek(0)
+                stderr_text = stderr_fp.read()
+
+            # yt-dlp prefixes per-URL failures with "ERROR:"; surface
+            # those lines on the results that never completed
+            error_lines = [
+                line for line in stderr_text.splitlines() if line.startswith('ERROR')
+            ]
+            error_text = '\n'.join(error_lines) or stderr_text.strip() or 'Download failed'
+
+            for result in results.values():
+                if not result['success']:
+                    result['error'] = error_text
+                    if progress_bar:
+                        progress_bar.update(1)
+
+        except Exception as e:
+            logger.error(f"Exception downloading batch: {str(e)}")
+            for result in results.values():
+                if not result['success']:
+                    result['error'] = str(e)
+
+        return list(results.values())
+
+    def results_iter(self, urls, custom_output_dir=None, custom_filenames=None):
+        """
+        Download multiple videos concurrently, yielding results as they
+        complete.
+
+        Generator form of download_multiple_videos for callers that want
+        to process results without materializing them. URLs sharing the
+        default output template are split into batches, one yt-dlp
+        process each, with the worker count bounding the number of
+        parallel processes. Per-URL custom filenames need a distinct
+        output template, so they keep the process-per-URL path.
+
+        Args:
+            urls (iterable): URLs to download; may be a lazy generator
+            custom_output_dir (str, optional): Custom output directory
+            custom_filenames (dict, optional): Dictionary mapping URLs to custom filenames
+
+        Yields:
+            dict: The next completed download result
+        """
+        skipped = 0
+        seen = set()
+
+        # Validate and deduplicate lazily so generator inputs (e.g. a
+        # streamed URL file) are never materialized; catching repeats here
+        # saves a full download attempt per duplicate instead of relying
+        # on the post-download set check
+        def _candidate_urls():
+            nonlocal skipped
+            for url in urls:
+                if url in seen or _URL_RE.match(url) is None or self._is_downloaded(url):
+                    skipped += 1
+                    continue
+                seen.add(url)
+                yield url
+
+        # Two-level parallelism: a few yt-dlp processes, each downloading
+        # max_concurrent fragments in parallel. More processes would just
+        # duplicate TLS handshakes and extractor state.
+        num_workers = 4
+
+        # In-process yt-dlp has no per-URL startup cost, so batching
+        # subprocesses buys nothing there; it is also the only way to
+        # honor per-URL filenames
+        if custom_filenames or yt_dlp is not None:
+            progress_bar = tqdm(desc="Downloading videos", unit="video")
+            url_iter = _candidate_urls()
+            in_flight = deque()
+
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                def _submit_next():
+                    for url in url_iter:
+                        in_flight.append((executor.submit(
+                            self.download_video,
+                            url,
+                            custom_output_dir,
+                            custom_filenames.get(url) if custom_filenames else None,
+                            True
+                        ), url))
+                        return True
+                    return False
+
+                # Bounded submission window: at most 2x workers futures in
+                # flight, so neither the pending set nor the input list
+                # grows with the URL count
+                for _ in range(num_workers * 2):
+                    if not _submit_next():
+                        break
+
+                while in_flight:
+                    future, url = in_flight.popleft()
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Exception processing {url}: {str(e)}")
+                        result = {
+                            'url': url,
+                            'success': False,
+                            'error': str(e)
+                        }
+
+                    progress_bar.update(1)
+                    _submit_next()
+                    yield result
+        else:
+            # The batched subprocess path chunks the list up front, so it
+            # has to materialize it
+            valid_urls = list(_candidate_urls())
+            progress_bar = tqdm(total=len(valid_urls), desc="Downloading videos")
+
+            if valid_urls:
+                # One interleaved chunk per worker keeps the batches balanced
+                output_dir = custom_output_dir or self.output_dir
+                num_workers = min(num_workers, len(valid_urls))
+                batches = [valid_urls[i::num_workers] for i in range(num_workers)]
+
+                with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                    futures = [
+                        executor.submit(self._download_batch, batch, output_dir, progress_bar)
+                        for batch in batches
+                    ]
+                    for future in as_completed(futures):
+                        try:
+                            yield from future.result()
+                        except Exception as e:
+                            logger.error(f"Exception processing batch: {str(e)}")
+
+        progress_bar.close()
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} invalid or duplicate URLs")
+
+    def download_multiple_videos(self, urls, custom_output_dir=None, custom_filenames=None, results_path=None):
         """
         Download multiple videos concurrently.
-        
+
         Args:
-            urls (list): List of URLs to download
+            urls (iterable): URLs to download; may be a lazy generator
             custom_output_dir (str, optional): Custom output directory
             custom_filenames (dict, optional): Dictionary mapping URLs to custom filenames
-        
+            results_path (str, optional): Append full results to this
+                JSONL file and keep only url/success/error in memory, so
+                peak memory no longer scales with per-video metadata size
+
         Returns:
-            list: List of download results
+            list: List of download results (lightweight summaries when
+            results_path is given)
         """
         results = []
-        
-        # Validate URLs
-        valid_urls = [url for url in urls if validators.url(url)]
-        if len(valid_urls) < len(urls):
-            logger.warning(f"Skipping {len(urls) - len(valid_urls)} invalid URLs")
-        
-        # Create progress bar
-        progress_bar = tqdm(total=len(valid_urls), desc="Downloading videos")
-        
-        # Use ThreadPoolExecutor for concurrent downloads
-        with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
-            future_to_url = {}
-            
-            for url in valid_urls:
-                filename = custom_filenames.get(url) if custom_filenames else None
-                future = executor.submit(
-                    self.download_video,
-                    url,
-                    custom_output_dir,
-                    filename
-                )
-                future_to_url[future] = url
-            
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    logger.error(f"Exception processing {url}: {str(e)}")
+        out = open(results_path, 'a', encoding='utf-8') if results_path else None
+
+        try:
+            for result in self.results_iter(urls, custom_output_dir, custom_filenames):
+                if out is not None:
+                    if orjson is not None:
+                        out.write(orjson.dumps(result).decode() + '\n')
+                    else:
+                        out.write(json.dumps(result) + '\n')
                     results.append({
-                        'url': url,
-                        'success': False,
-                        'error': str(e)
+                        'url': result['url'],
+                        'success': result.get('success', False),
+                        'error': result.get('error')
                     })
-                
-                progress_bar.update(1)
-        
-        progress_bar.close()
-        
+                else:
+                    results.append(result)
+        finally:
+            if out is not None:
+                out.close()
+
         # Print summary
         successful = sum(1 for r in results if r.get('success', False))
         logger.info(f"Downloaded {successful} of {len(results)} videos")
-        
+
         return results
     
     def extract_metadata_only(self, url):
         """
         Extract metadata from a video without downloading it.
-        
+
+        Results are memoized per URL, so repeated probes in the same
+        session cost a dict lookup instead of an extractor round-trip.
+
         Args:
             url (str): URL of the video to extract metadata from
-        
+
         Returns:
             dict: Video metadata or None if failed
         """
         # Validate URL
-        if not validators.url(url):
+        if _URL_RE.match(url) is None:
             logger.error(f"Invalid URL: {url}")
             return None
-        
+
+        return self._extract_metadata(url)
+
+    def clear_metadata_cache(self):
+        """Drop memoized metadata so the next probe hits the network."""
+        self._extract_metadata.cache_clear()
+
+    def _extract_metadata_uncached(self, url):
+        """Fetch metadata for a validated URL (memoized wrapper above)."""
+        # In-process path: no subprocess, no JSON parse of stdout
+        if yt_dlp is not None:
+            try:
+                ydl = self._get_ydl()
+                info = ydl.extract_info(url, download=False)
+                return ydl.sanitize_info(info) if info is not None else None
+            except Exception as e:
+                logger.error(f"Exception extracting metadata for {url}: {str(e)}")
+                return None
+
         # Build yt-dlp command for metadata only
         cmd = [
             'yt-dlp',
@@ -298,17 +734,42 @@ class VideoDownloader:
             list: List of download results
         """
         try:
+            # Stream the file: lines are validated/deduped lazily inside
+            # download_multiple_videos, so the first download starts
+            # before the file has been fully read
             with open(input_file, 'r') as f:
-                urls = [line.strip() for line in f if line.strip()]
-            
-            return self.download_multiple_videos(urls, custom_output_dir)
+                urls = (line.strip() for line in f if line.strip())
+                return self.download_multiple_videos(urls, custom_output_dir)
         
         except Exception as e:
             logger.error(f"Error loading URLs from file: {str(e)}")
             return []
 
 
-def download_videos(
+def _iter_urls(urls=None, input_file=None):
+    """
+    Yield candidate URLs lazily from a list or an input file.
+
+    Args:
+        urls (list or str, optional): URLs to yield as-is
+        input_file (str, optional): Path to a file containing URLs
+
+    Yields:
+        str: The next URL.
+    """
+    if urls:
+        if isinstance(urls, str):
+            urls = [urls]
+        yield from urls
+    elif input_file:
+        with open(input_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+
+async def download_videos_async(
     urls=None,
     input_file=None,
     output_dir='downloads',
@@ -318,8 +779,11 @@ def download_videos(
     skip_existing=True
 ):
     """
-    Download videos from URLs or a file.
-    
+    Download videos from URLs or a file on an asyncio event loop.
+
+    Concurrency is bounded by a semaphore instead of a thread pool, so one
+    OS thread drives any number of in-flight downloads.
+
     Args:
         urls (list, optional): List of URLs to download
         input_file (str, optional): Path to a file containing URLs
@@ -328,7 +792,7 @@ def download_videos(
         max_concurrent (int): Maximum number of concurrent downloads
         quality (str): Video quality to download ('best', '1080p', '720p', etc.)
         skip_existing (bool): Whether to skip existing files
-    
+
     Returns:
         list: List of download results
     """
@@ -340,18 +804,89 @@ def download_videos(
         quality=quality,
         skip_existing=skip_existing
     )
-    
-    # Download from URLs
-    if urls:
-        if isinstance(urls, str):
-            urls = [urls]
-        
-        return downloader.download_multiple_videos(urls)
-    
-    # Download from file
-    elif input_file:
-        return downloader.download_from_file(input_file)
-    
-    else:
+
+    if not urls and not input_file:
         logger.error("No URLs or input file provided")
         return []
+
+    # URLs flow through a bounded queue so a million-line input file never
+    # gets materialized; memory stays O(max_concurrent) and the first
+    # download starts before the file is fully read
+    queue = asyncio.Queue(maxsize=max_concurrent * 4)
+    results = []
+    skipped = 0
+    progress_bar = tqdm(desc="Downloading videos", unit="video")
+
+    async def _producer():
+        nonlocal skipped
+        try:
+            for url in _iter_urls(urls, input_file):
+                if _URL_RE.match(url) is None:
+                    skipped += 1
+                    continue
+                await queue.put(url)
+        except Exception as e:
+            logger.error(f"Error loading URLs: {str(e)}")
+        finally:
+            # One sentinel per worker shuts the pool down
+            for _ in range(max_concurrent):
+                await queue.put(None)
+
+    async def _worker():
+        while True:
+            url = await queue.get()
+            if url is None:
+                return
+            # The worker count bounds concurrency; the subprocess is
+            # awaited on the loop itself, not in a thread
+            results.append(await downloader.download_video_async(url, _validated=True))
+            progress_bar.update(1)
+
+    await asyncio.gather(_producer(), *(_worker() for _ in range(max_concurrent)))
+    progress_bar.close()
+
+    if skipped:
+        logger.warning(f"Skipping {skipped} invalid URLs")
+
+    # Print summary
+    successful = sum(1 for r in results if r.get('success', False))
+    logger.info(f"Downloaded {successful} of {len(results)} videos")
+
+    return results
+
+
+def download_videos(
+    urls=None,
+    input_file=None,
+    output_dir='downloads',
+    max_retries=3,
+    max_concurrent=5,
+    quality='best',
+    skip_existing=True
+):
+    """
+    Download videos from URLs or a file.
+
+    Thin synchronous shim around download_videos_async.
+
+    Args:
+        urls (list, optional): List of URLs to download
+        input_file (str, optional): Path to a file containing URLs
+        output_dir (str): Directory to save downloaded videos
+        max_retries (int): Maximum number of retries for failed downloads
+        max_concurrent (int): Maximum number of concurrent downloads
+        quality (str): Video quality to download ('best', '1080p', '720p', etc.)
+        skip_existing (bool): Whether to skip existing files
+
+    Returns:
+        list: List of download results
+    """
+    return asyncio.run(download_videos_async(
+        urls=urls,
+        input_file=input_file,
+        output_dir=output_dir,
+        max_retries=max_retries,
+        max_concurrent=max_concurrent,
+        quality=quality,
+        skip_existing=skip_existing
+    ))
@@ -10,10 +10,18 @@ import argparse
 import logging
 from pathlib import Path
 
-from twisted.internet import reactor
 from scrapy.crawler import CrawlerRunner
 from scrapy.utils.log import configure_logging
 from scrapy.utils.project import get_project_settings
+from scrapy.utils.reactor import install_reactor
+
+from config.settings import SETTINGS
+
+# The settings select a non-default reactor; it must be installed before
+# twisted.internet.reactor is imported, or that import pins the default
+# epoll reactor and Scrapy's reactor verification fails on every run
+install_reactor(SETTINGS['TWISTED_REACTOR'])
+from twisted.internet import reactor
 
 # Import the spider
 from spider.video_spider import VideoSpider
@@ -50,7 +58,6 @@ def main():
     logger = logging.getLogger('video_spider')
     
     # Get Scrapy settings
-    from config.settings import SETTINGS
     settings = get_project_settings()
     settings.update(SETTINGS)
     
@@ -3,24 +3,59 @@ Core video spider implementation for crawling video websites.
 This module provides the main spider class that handles crawling and data extraction.
 """
 
+import functools
+import itertools
+import json
 import logging
 import os
+import re
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
-import networkx as nx
+from urllib.parse import urljoin, urlsplit
 import scrapy
+from lxml import etree
+from parsel.csstranslator import HTMLTranslator
+from scrapy.selector import SelectorList
 from scrapy_splash import SplashRequest
 
-from ..utils.selectors import DEFAULT_SELECTORS
-from ..utils.lua_scripts import MAIN_SCRIPT
+try:
+    from pybloom_live import ScalableBloomFilter
+except ImportError:
+    # pybloom-live is optional; exact sets are the fallback
+    ScalableBloomFilter = None
+
+from ..utils.compact_graph import CompactVideoGraph
+from ..utils.selectors import get_selectors_for_website
+from ..utils.lua_scripts import get_main_script
 
 logger = logging.getLogger(__name__)
 
+# Last path segment of a video URL, ignoring trailing slash, query and
+# fragment. One C regex pass instead of rstrip/split list churn.
+_VID_RE = re.compile(r'/([^/?#]+)/?(?:[?#].*)?$')
+
+
+@functools.lru_cache(maxsize=4096)
+def _extract_video_id(url):
+    """Extract the last path segment from a URL, or None."""
+    match = _VID_RE.search(url)
+    return match.group(1) if match else None
+
 
 class VideoSpider(scrapy.Spider):
     """Spider for scraping video content using Splash for JavaScript rendering."""
     
     name = 'video_spider'
+
+    # Splash render arguments shared by every request (90s render
+    # timeout); per-request dicts are a cheap spread of this template
+    _SPLASH_ARGS_TEMPLATE = {
+        'wait': 3,
+        'timeout': 90,
+        'images': 0,
+        'resource_timeout': 15,
+    }
     
     def __init__(
         self,
@@ -55,12 +90,32 @@ class VideoSpider(scrapy.Spider):
         self.videos_scraped = 0
         self.current_depth = 0
         self.max_depth = max_depth
-        self.crawled_urls = set()
-        self.pages_crawled = {}
+        # Seen-URL tracking. Bloom filters bound dedup memory to a few
+        # bits per URL on long crawls (a set costs 100+ bytes per URL);
+        # the rare false positive just skips one page, which a scraper
+        # can afford. Without pybloom-live, exact sets do the same job.
+        if ScalableBloomFilter is not None:
+            self.crawled_urls = ScalableBloomFilter(
+                initial_capacity=100000,
+                error_rate=1e-6,
+                mode=ScalableBloomFilter.SMALL_SET_GROWTH,
+            )
+            self.enqueued_urls = ScalableBloomFilter(
+                initial_capacity=100000,
+                error_rate=1e-6,
+                mode=ScalableBloomFilter.SMALL_SET_GROWTH,
+            )
+        else:
+            self.crawled_urls = set()
+            self.enqueued_urls = set()
+        # Bloom membership is approximate, so keep an exact page count
+        self._crawled_count = 0
+        self.pages_crawled = Counter()
         self.max_pages_per_category = max_pages_per_category
         
-        # Video relationship graph
-        self.video_graph = nx.DiGraph()
+        # Video relationship graph (compact arrays, not networkx — long
+        # crawls would otherwise spend hundreds of bytes per edge)
+        self.video_graph = CompactVideoGraph()
         
         # Configuration
         self.max_videos = max_videos
@@ -69,68 +124,163 @@ class VideoSpider(scrapy.Spider):
         # Directory setup
         self.output_dir = output_dir
         self.screenshots_dir = screenshots_dir
-        os.makedirs(self.output_dir, exist_ok=True)
-        os.makedirs(self.screenshots_dir, exist_ok=True)
+        self._ensure_dir(self.output_dir)
+        self._ensure_dir(self.screenshots_dir)
         
+        # Screenshot names: one run timestamp captured here plus a
+        # monotonic counter, so same-second requests no longer collide
+        # (datetime.now() per request silently overwrote screenshots)
+        self._shot_prefix = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._shot_idx = itertools.count()
+
         # Set up graph file path
         self.graph_file = os.path.join(self.output_dir, 'video_relationships.gexf')
+
+        # Shared-string pool for node attributes: titles, durations and
+        # thumbnail paths repeat heavily across a crawl, so duplicates
+        # collapse to one str object instead of one per node
+        self._strpool = {}
+
+        # Append-only journals: each node/edge costs one line write as it
+        # arrives, instead of re-serializing the whole graph periodically.
+        # Line-buffered so every record is flushed to disk immediately.
+        self._nodes_fp = open(os.path.join(self.output_dir, 'nodes.jsonl'), 'a', buffering=1)
+        self._edges_fp = open(os.path.join(self.output_dir, 'edges.jsonl'), 'a', buffering=1)
         
-        # Set up selectors
-        self.selectors = DEFAULT_SELECTORS.copy()
+        # Set up selectors, specialized for the start site when it is a
+        # known one. The CSS strings are translated to XPath once here;
+        # response.css() would redo that translation on every call.
+        self.selectors = get_selectors_for_website(self.start_url)
+        translator = HTMLTranslator()
+        self._xp = {
+            name: translator.css_to_xpath(css)
+            for name, css in self.selectors.items() if css
+        }
+
+        # parse_video_listing is the hot loop: compile its item and field
+        # XPaths to lxml callables once and run them straight on the lxml
+        # elements, skipping a parsel Selector wrapper per probe
+        self._listing_items_xpath = etree.XPath(self._xp['video_item'])
+        self._listing_field_xpaths = tuple(
+            etree.XPath(self._xp[field], smart_strings=False)
+            for field in ('video_url', 'video_title', 'video_thumbnail',
+                          'video_duration', 'video_views')
+        )
+
+        # One compiled probe answers all three page-type checks in a
+        # single tree walk. Bit 0 = video player, bit 1 = category grid,
+        # bit 2 = video grid; the lowest set bit wins, mirroring the old
+        # if/elif priority.
+        self._type_xpath = etree.XPath(
+            'boolean(%s) + boolean(%s)*2 + boolean(%s)*4' % (
+                self._xp['video_player'],
+                self._xp['category_grid'],
+                self._xp['video_grid'],
+            )
+        )
+        self._page_types = tuple(
+            'video' if bits & 1 else
+            'category' if bits & 2 else
+            'listing' if bits & 4 else
+            'unknown'
+            for bits in range(8)
+        )
+
+        # Page-type handler table; category pages drop out entirely when
+        # skip_categories is set
+        self._dispatch = {
+            'video': self.parse_video_page,
+            'listing': self.parse_video_listing,
+        }
+        if not skip_categories:
+            self._dispatch['category'] = self.parse_category_page
         
         logger.info(f'Starting spider with URL: {self.start_url}')
         logger.info(f'Output directory: {self.output_dir}')
         logger.info(f'Screenshots directory: {self.screenshots_dir}')
         logger.info(f'Max videos: {self.max_videos}, Max depth: {self.max_depth}')
     
+    @staticmethod
+    def _ensure_dir(path):
+        """Create a directory, skipping the syscalls when it exists."""
+        try:
+            os.mkdir(path)
+        except FileExistsError:
+            pass
+        except FileNotFoundError:
+            os.makedirs(path, exist_ok=True)
+
     def start_requests(self):
         """Generate initial requests."""
         self.logger.info(f'Starting requests for URL: {self.start_url}')
         yield self.make_splash_request(self.start_url, self.parse, meta={'depth': 0})
     
+    def _should_enqueue(self, url):
+        """Check whether a URL is worth queueing for a Splash render."""
+        return url not in self.crawled_urls and url not in self.enqueued_urls
+
     def make_splash_request(self, url, callback, meta=None):
-        """Create a Splash request with the Lua script."""
+        """Create a Splash request with the Lua script.
+
+        Returns None for URLs that are already crawled or queued, so each
+        URL pays for at most one Splash render.
+        """
+        if not self._should_enqueue(url):
+            return None
+        self.enqueued_urls.add(url)
+
         if meta is None:
             meta = {}
         
         # Add screenshot filename to meta
         if 'screenshot' not in meta:
-            screenshot_filename = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+            screenshot_filename = f'screenshot_{self._shot_prefix}_{next(self._shot_idx):08d}.png'
             meta['screenshot'] = os.path.join(self.screenshots_dir, screenshot_filename)
         
-        # Set the default render timeout to 90 seconds
-        splash_args = {
-            'lua_source': MAIN_SCRIPT,
-            'wait': 3,
-            'timeout': 90,
-            'images': 0,
-            'resource_timeout': 15,
-        }
+        splash_args = {**self._SPLASH_ARGS_TEMPLATE, 'lua_source': get_main_script()}
         
-        # Return the SplashRequest
+        # Return the SplashRequest. cache_args stores the Lua script on
+        # the Splash server after the first request, so every later POST
+        # sends a short hash instead of re-uploading the whole script.
         return SplashRequest(
             url=url,
             callback=callback,
             endpoint='execute',
             args=splash_args,
+            cache_args=['lua_source'],
             meta=meta,
         )
     
+    @staticmethod
+    def _make_urljoin(response):
+        """Build a urljoin fast path bound to one parsed base URL.
+
+        The base is split once per response instead of once per link;
+        host-absolute paths (the dominant case on these sites) become a
+        plain concatenation, everything else falls back to urljoin.
+        """
+        base = urlsplit(response.url)
+        prefix = f'{base.scheme}://{base.netloc}'
+        base_url = response.url
+
+        def _join(rel):
+            if rel.startswith(('http://', 'https://')):
+                return rel
+            if rel.startswith('/') and not rel.startswith('//'):
+                return prefix + rel
+            return urljoin(base_url, rel)
+
+        return _join
+
+    def _select(self, node, name):
+        """Run a precompiled selector against a response or selector."""
+        xpath = self._xp.get(name)
+        return node.xpath(xpath) if xpath else SelectorList()
+
     def determine_page_type(self, response):
         """Determine the type of page we're on."""
-        # Check for video player (individual video page)
-        if response.css(self.selectors['video_player']):
-            return 'video'
-        
-        # Check for category grid (category listing page)
-        elif response.css(self.selectors['category_grid']):
-            return 'category'
-        
-        # Check for video grid (video listing page)
-        elif response.css(self.selectors['video_grid']):
-            return 'listing'
-        
-        return 'unknown'
+        bits = int(self._type_xpath(response.selector.root))
+        return self._page_types[bits]
     
     def parse(self, response):
         """Parse the response and extract data based on page type."""
@@ -141,6 +291,7 @@ class VideoSpider(scrapy.Spider):
                 return
             
             self.crawled_urls.add(response.url)
+            self._crawled_count += 1
             
             # Check if we've reached the maximum number of videos
             if self.videos_scraped >= self.max_videos:
@@ -164,18 +315,11 @@ class VideoSpider(scrapy.Spider):
             self.logger.info(f'Processing {page_type} page: {response.url} (depth: {depth})')
             
             # Handle different page types
-            if page_type == 'video':
-                yield from self.parse_video_page(response)
-            elif page_type == 'category' and not self.skip_categories:
-                yield from self.parse_category_page(response)
-            elif page_type == 'listing':
-                yield from self.parse_video_listing(response)
+            handler = self._dispatch.get(page_type)
+            if handler is not None:
+                yield from handler(response)
             else:
                 self.logger.warning(f'Unknown page type for URL: {response.url}')
-            
-            # Save the graph periodically
-            if self.videos_scraped % 10 == 0:
-                self.save_graph()
         
         except Exception as e:
             self.logger.error(f'Error parsing response: {str(e)}')
@@ -200,32 +344,44 @@ class VideoSpider(scrapy.Spider):
             self.videos_scraped += 1
             
             # Add node to the graph
-            self.video_graph.add_node(video_id, **video_info)
+            self._record_node(video_id, **video_info)
             
             # Extract related videos
-            related_videos = response.css(self.selectors.get('related_videos', ''))
+            related_videos = self._select(response, 'related_videos')
             if related_videos:
-                for video in related_videos.css(self.selectors.get('related_video_item', '')):
-                    related_url = video.css(self.selectors.get('related_video_url', '')).get()
+                join = self._make_urljoin(response)
+                follow_urls = []
+                nodes = []
+                edges = []
+                for video in self._select(related_videos, 'related_video_item'):
+                    related_url = self._select(video, 'related_video_url').get()
                     if related_url:
-                        related_url = response.urljoin(related_url)
+                        related_url = join(related_url)
                         related_id = self.extract_video_id_from_url(related_url)
-                        related_title = video.css(self.selectors.get('related_video_title', '')).get()
-                        
-                        # Add edge to the graph
-                        self.video_graph.add_edge(video_id, related_id)
-                        
-                        # Add related video to the graph
-                        self.video_graph.add_node(related_id, title=related_title, url=related_url)
-                        
-                        # Only follow the link if we haven't reached max depth
-                        new_depth = response.meta.get('depth', 0) + 1
-                        if new_depth <= self.max_depth and self.videos_scraped < self.max_videos:
-                            yield self.make_splash_request(
-                                related_url,
-                                self.parse,
-                                meta={'depth': new_depth}
-                            )
+                        related_title = self._select(video, 'related_video_title').get()
+
+                        nodes.append((related_id, {'title': related_title, 'url': related_url}))
+                        edges.append((video_id, related_id))
+                        follow_urls.append(related_url)
+
+                # One batched graph update and journal write per page
+                self._record_nodes(nodes)
+                self._record_edges(edges)
+
+                # Related-video rails repeat entries; dedupe (order preserved)
+                # before queueing so each URL is rendered at most once
+                new_depth = response.meta.get('depth', 0) + 1
+                if new_depth <= self.max_depth:
+                    for related_url in dict.fromkeys(follow_urls):
+                        if self.videos_scraped >= self.max_videos:
+                            break
+                        request = self.make_splash_request(
+                            related_url,
+                            self.parse,
+                            meta={'depth': new_depth}
+                        )
+                        if request:
+                            yield request
             
             yield video_info
         
@@ -238,45 +394,37 @@ class VideoSpider(scrapy.Spider):
         
         try:
             # Extract category metadata
-            category_items = response.css(self.selectors.get('category_item', ''))
-            
+            category_items = self._select(response, 'category_item')
+
+            join = self._make_urljoin(response)
+            follow_urls = []
             for item in category_items:
-                category_url = item.css(self.selectors.get('category_url', '')).get()
+                category_url = self._select(item, 'category_url').get()
                 if category_url:
-                    category_url = response.urljoin(category_url)
-                    category_title = item.css(self.selectors.get('category_title', '')).get()
-                    
+                    category_url = join(category_url)
+                    category_title = self._select(item, 'category_title').get()
+
                     self.logger.info(f'Found category: {category_title} ({category_url})')
-                    
-                    # Only follow the link if we haven't reached max depth
-                    new_depth = response.meta.get('depth', 0) + 1
-                    if new_depth <= self.max_depth and self.videos_scraped < self.max_videos:
-                        yield self.make_splash_request(
-                            category_url,
-                            self.parse,
-                            meta={'depth': new_depth}
-                        )
-            
-            # Check for pagination
-            next_page = response.css(self.selectors.get('next_page', '')).get()
-            if next_page:
-                next_page_url = response.urljoin(next_page)
-                
-                # Check if we've reached the max pages for this category
-                current_base_url = response.url.split('?')[0]
-                self.pages_crawled[current_base_url] = self.pages_crawled.get(current_base_url, 0) + 1
-                
-                if self.pages_crawled[current_base_url] < self.max_pages_per_category:
-                    self.logger.info(f'Following next page {self.pages_crawled[current_base_url] + 1} for {current_base_url}')
-                    
-                    # Keep the same depth level for pagination
-                    yield self.make_splash_request(
-                        next_page_url,
+                    follow_urls.append(category_url)
+
+            # Dedupe before queueing so repeated category links cost one render
+            new_depth = response.meta.get('depth', 0) + 1
+            if new_depth <= self.max_depth:
+                for category_url in dict.fromkeys(follow_urls):
+                    if self.videos_scraped >= self.max_videos:
+                        break
+                    request = self.make_splash_request(
+                        category_url,
                         self.parse,
-                        meta={'depth': response.meta.get('depth', 0)}
+                        meta={'depth': new_depth}
                     )
-                else:
-                    self.logger.info(f'Reached maximum pages ({self.max_pages_per_category}) for {current_base_url}')
+                    if request:
+                        yield request
+            
+            # Check for pagination
+            request = self._next_page_request(response)
+            if request:
+                yield request
         
         except Exception as e:
             self.logger.error(f'Error parsing category page: {str(e)}')
@@ -286,60 +434,55 @@ class VideoSpider(scrapy.Spider):
         self.logger.info(f'Parsing video listing page: {response.url}')
         
         try:
-            # Extract video items
-            video_items = response.css(self.selectors.get('video_item', ''))
-            
+            # Extract video items with the compiled XPaths, one pass per
+            # field per item over the bare lxml tree
+            video_items = self._listing_items_xpath(response.selector.root)
+
+            join = self._make_urljoin(response)
+            follow_urls = []
+            nodes = []
             for item in video_items:
-                video_url = item.css(self.selectors.get('video_url', '')).get()
+                video_url, video_title, video_thumbnail, video_duration, video_views = (
+                    values[0] if values else None
+                    for values in (xpath(item) for xpath in self._listing_field_xpaths)
+                )
                 if video_url:
-                    video_url = response.urljoin(video_url)
-                    video_title = item.css(self.selectors.get('video_title', '')).get()
-                    video_thumbnail = item.css(self.selectors.get('video_thumbnail', '')).get()
-                    video_duration = item.css(self.selectors.get('video_duration', '')).get()
-                    video_views = item.css(self.selectors.get('video_views', '')).get()
-                    
+                    video_url = join(video_url)
+
                     video_id = self.extract_video_id_from_url(video_url)
-                    
-                    # Add node to the graph
-                    self.video_graph.add_node(
-                        video_id,
-                        title=video_title,
-                        url=video_url,
-                        thumbnail=video_thumbnail,
-                        duration=video_duration,
-                        views=video_views,
-                        depth=response.meta.get('depth', 0)
+
+                    nodes.append((video_id, {
+                        'title': video_title,
+                        'url': video_url,
+                        'thumbnail': video_thumbnail,
+                        'duration': video_duration,
+                        'views': video_views,
+                        'depth': response.meta.get('depth', 0),
+                    }))
+
+                    follow_urls.append(video_url)
+
+            # One batched graph update and journal write per page
+            self._record_nodes(nodes)
+
+            # Dedupe before queueing so repeated listing links cost one render
+            new_depth = response.meta.get('depth', 0) + 1
+            if new_depth <= self.max_depth:
+                for video_url in dict.fromkeys(follow_urls):
+                    if self.videos_scraped >= self.max_videos:
+                        break
+                    request = self.make_splash_request(
+                        video_url,
+                        self.parse,
+                        meta={'depth': new_depth}
                     )
-                    
-                    # Only follow the link if we haven't reached max depth
-                    new_depth = response.meta.get('depth', 0) + 1
-                    if new_depth <= self.max_depth and self.videos_scraped < self.max_videos:
-                        yield self.make_splash_request(
-                            video_url,
-                            self.parse,
-                            meta={'depth': new_depth}
-                        )
+                    if request:
+                        yield request
             
             # Check for pagination
-            next_page = response.css(self.selectors.get('next_page', '')).get()
-            if next_page:
-                next_page_url = response.urljoin(next_page)
-                
-                # Check if we've reached the max pages for this listing
-                current_base_url = response.url.split('?')[0]
-                self.pages_crawled[current_base_url] = self.pages_crawled.get(current_base_url, 0) + 1
-                
-                if self.pages_crawled[current_base_url] < self.max_pages_per_category:
-                    self.logger.info(f'Following next page {self.pages_crawled[current_base_url] + 1} for {current_base_url}')
-                    
-                    # Keep the same depth level for pagination
-                    yield self.make_splash_request(
-                        next_page_url,
-                        self.parse,
-                        meta={'depth': response.meta.get('depth', 0)}
-                    )
-                else:
-                    self.logger.info(f'Reached maximum pages ({self.max_pages_per_category}) for {current_base_url}')
+            request = self._next_page_request(response)
+            if request:
+                yield request
         
         except Exception as e:
             self.logger.error(f'Error parsing video listing page: {str(e)}')
@@ -349,21 +492,90 @@ class VideoSpider(scrapy.Spider):
         if not url:
             return None
         
-        # Simple method: use the last part of the URL path
-        parts = url.rstrip('/').split('/')
-        return parts[-1] if parts else None
+        # Related-video links repeat across pages, so the parse is cached
+        return _extract_video_id(url)
     
+    def _next_page_request(self, response):
+        """Build the pagination request for a page, or None when done."""
+        next_page = self._select(response, 'next_page').get()
+        if not next_page:
+            return None
+
+        # Check if we've reached the max pages for this base URL; the
+        # Counter makes the per-page bookkeeping a single dict update
+        base_url = urlsplit(response.url)._replace(query='', fragment='').geturl()
+        self.pages_crawled[base_url] += 1
+        count = self.pages_crawled[base_url]
+
+        if count >= self.max_pages_per_category:
+            self.logger.info(f'Reached maximum pages ({self.max_pages_per_category}) for {base_url}')
+            return None
+
+        self.logger.info(f'Following next page {count + 1} for {base_url}')
+
+        # Keep the same depth level for pagination
+        return self.make_splash_request(
+            response.urljoin(next_page),
+            self.parse,
+            meta={'depth': response.meta.get('depth', 0)}
+        )
+
+    def _intern(self, value):
+        """Return a pooled copy of a string so duplicates share storage."""
+        if not isinstance(value, str):
+            return value
+        # Cap the pool so a pathological crawl of unique strings cannot
+        # turn the deduplicator itself into the memory hog
+        if len(self._strpool) >= 100_000:
+            return self._strpool.get(value, value)
+        return self._strpool.setdefault(value, value)
+
+    def _record_node(self, key, **attrs):
+        """Add a node to the graph and append it to the node journal."""
+        attrs = {name: self._intern(value) for name, value in attrs.items()}
+        self.video_graph.add_node(key, **attrs)
+        self._nodes_fp.write(json.dumps({'id': key, **attrs}) + '\n')
+
+    def _record_edge(self, src_key, dst_key):
+        """Add an edge to the graph and append it to the edge journal."""
+        self.video_graph.add_edge(src_key, dst_key)
+        self._edges_fp.write(json.dumps({'source': src_key, 'target': dst_key}) + '\n')
+
+    def _record_nodes(self, nodes):
+        """Batch-add (key, attrs) nodes; one journal write for the lot."""
+        if not nodes:
+            return
+        nodes = [
+            (key, {name: self._intern(value) for name, value in attrs.items()})
+            for key, attrs in nodes
+        ]
+        self.video_graph.add_nodes_from(nodes)
+        self._nodes_fp.writelines(
+            json.dumps({'id': key, **attrs}) + '\n' for key, attrs in nodes
+        )
+
+    def _record_edges(self, pairs):
+        """Batch-add (src, dst) edges; one journal write for the lot."""
+        if not pairs:
+            return
+        self.video_graph.add_edges_from(pairs)
+        self._edges_fp.writelines(
+            json.dumps({'source': src, 'target': dst}) + '\n' for src, dst in pairs
+        )
+
     def save_graph(self):
         """Save the video graph to a file."""
         try:
             if self.video_graph.number_of_nodes() > 0:
                 self.logger.info(f'Saving graph with {self.video_graph.number_of_nodes()} nodes and {self.video_graph.number_of_edges()} edges')
-                nx.write_gexf(self.video_graph, self.graph_file)
+                self.video_graph.write_gexf(self.graph_file)
                 self.logger.info(f'Graph saved to {self.graph_file}')
         except Exception as e:
             self.logger.error(f'Error saving graph: {str(e)}')
     
     def closed(self, reason):
         """Called when the spider is closed."""
-        self.logger.info(f'Spider closed: {reason}')
+        self.logger.info(f'Spider closed: {reason} ({self._crawled_count} pages crawled)')
         self.save_graph()
+        self._nodes_fp.close()
+        self._edges_fp.close()
@@ -4,14 +4,18 @@ This module provides access to the Lua scripts used by Splash.
 """
 
 import os
+import sys
+from functools import lru_cache
 from pathlib import Path
 
 # Get the directory where the Lua scripts are located
 LUA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'lua_scripts')
 
+@lru_cache(maxsize=8)
 def load_lua_script(script_name):
     """
-    Load a Lua script from file.
+    Load a Lua script from file. Repeated loads of the same script are
+    served from cache instead of re-reading the file.
     
     Args:
         script_name (str): The name of the Lua script file.
@@ -23,24 +27,42 @@ def load_lua_script(script_name):
     with open(script_path, 'r', encoding='utf-8') as f:
         return f.read()
 
-# Load the main script
-try:
-    MAIN_SCRIPT = load_lua_script('video_scraper.lua')
-except Exception as e:
-    print(f"Error loading Lua script: {e}")
-    MAIN_SCRIPT = """
-        function main(splash, args)
-            -- Basic fallback script
-            splash:go(args.url)
-            splash:wait(3)
-            return {
-                html = splash:html(),
-                info = {
-                    url = splash:url(),
-                    title = splash:evaljs("document.title"),
-                    status = 200
-                }
+# Fallback used when the script file cannot be read
+_FALLBACK_SCRIPT = """
+    function main(splash, args)
+        -- Basic fallback script
+        splash:go(args.url)
+        splash:wait(3)
+        return {
+            html = splash:html(),
+            info = {
+                url = splash:url(),
+                title = splash:evaljs("document.title"),
+                status = 200
             }
-        end
-        return {main=main}
+        }
+    end
+    return {main=main}
+"""
+
+_MAIN_SCRIPT = None
+
+
+def get_main_script():
+    """
+    Return the main Splash Lua script, loading it on first use.
+
+    The file read happens lazily instead of at import time, and the one
+    interned copy is shared by every Splash request.
+
+    Returns:
+        str: The content of the main Lua script.
     """
+    global _MAIN_SCRIPT
+    if _MAIN_SCRIPT is None:
+        try:
+            _MAIN_SCRIPT = sys.intern(load_lua_script('video_scraper.lua'))
+        except Exception as e:
+            print(f"Error loading Lua script: {e}")
+            _MAIN_SCRIPT = sys.intern(_FALLBACK_SCRIPT)
+    return _MAIN_SCRIPT
@@ -3,8 +3,12 @@ Default CSS selectors for different video websites.
 These selectors are used by the spider to extract information from HTML pages.
 """
 
-# Default selectors for different video sites
-DEFAULT_SELECTORS = {
+import re
+import types
+
+# Default selectors for different video sites. Read-only so every
+# spider instance can share the one mapping instead of copying it.
+DEFAULT_SELECTORS = types.MappingProxyType({
     # Category page selectors
     'category_grid': '#categories, .categories, .category-list',
     'category_item': '.category-item, .cat-item, .thumb',
@@ -28,7 +32,7 @@ DEFAULT_SELECTORS = {
     'related_video_item': '.thumb-block',
     'related_video_url': '.thumb-under .title a::attr(href)',
     'related_video_title': '.thumb-under .title a::text'
-}
+})
 
 # Website-specific selectors
 WEBSITE_SELECTORS = {
@@ -71,6 +75,16 @@ WEBSITE_SELECTORS = {
     # Add more website-specific selectors here
 }
 
+# Freeze the per-site overrides too
+WEBSITE_SELECTORS = {
+    website: types.MappingProxyType(selectors)
+    for website, selectors in WEBSITE_SELECTORS.items()
+}
+
+# One alternation regex matches any known site name in a single C-level
+# pass, instead of a Python substring scan per site
+_SITE_RE = re.compile('|'.join(map(re.escape, WEBSITE_SELECTORS)))
+
 
 def get_selectors_for_website(url):
     """
@@ -82,14 +96,13 @@ def get_selectors_for_website(url):
     Returns:
         dict: The selectors for the website.
     """
-    # Default selectors
-    selectors = DEFAULT_SELECTORS.copy()
-    
     # Check for known websites
-    for website, website_selectors in WEBSITE_SELECTORS.items():
-        if website in url:
-            # Update default selectors with website-specific ones
-            selectors.update(website_selectors)
-            break
+    match = _SITE_RE.search(url)
+    if match:
+        # Merge the website-specific overrides into the defaults
+        return types.MappingProxyType(
+            {**DEFAULT_SELECTORS, **WEBSITE_SELECTORS[match.group(0)]}
+        )
     
-    return selectors
+    # Unknown site: share the read-only defaults, no copy
+    return DEFAULT_SELECTORS